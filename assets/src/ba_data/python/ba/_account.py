@@ -129,6 +129,8 @@ def ensure_have_account_player_profile() -> None:
     Ensure the standard account-named player profile exists;
     creating if needed.
     """
+    from ba._profile import clear_player_profile_colors_cache
+
     # This only applies when we're signed in.
     if _ba.get_account_state() != 'signed_in':
         return
@@ -153,6 +155,7 @@ def ensure_have_account_player_profile() -> None:
             }
         })
         _ba.run_transactions()
+        clear_player_profile_colors_cache()
 
 
 def have_pro() -> bool:
@@ -214,3 +217,7 @@ def on_account_state_changed() -> None:
             })
         _ba.run_transactions()
         app.pending_promo_codes = []
+
+    # Server-mode may be waiting on sign-in before it can launch.
+    if app.server is not None:
+        app.server.on_account_state_changed()
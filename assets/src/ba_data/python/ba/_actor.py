@@ -36,6 +36,10 @@ if TYPE_CHECKING:
 
 T = TypeVar('T', bound='Actor')
 
+# Messages are immutable so we can share these for our common cases.
+_DIE_MESSAGE = DieMessage()
+_OUT_OF_BOUNDS_DIE_MESSAGE = DieMessage(how=DeathType.OUT_OF_BOUNDS)
+
 
 class Actor:
     """High level logical entities in a ba.Activity.
@@ -98,7 +102,7 @@ class Actor:
             # That way we can treat DieMessage handling as the single
             # point-of-action for death.
             if not self.is_expired():
-                self.handlemessage(DieMessage())
+                self.handlemessage(_DIE_MESSAGE)
         except Exception:
             _error.print_exception('exception in ba.Actor.__del__() for', self)
 
@@ -109,7 +113,7 @@ class Actor:
 
         # By default, actors going out-of-bounds simply kill themselves.
         if isinstance(msg, OutOfBoundsMessage):
-            return self.handlemessage(DieMessage(how=DeathType.OUT_OF_BOUNDS))
+            return self.handlemessage(_OUT_OF_BOUNDS_DIE_MESSAGE)
 
         return _error.UNHANDLED
 
@@ -54,7 +54,7 @@ class DeathType(Enum):
     LEFT_GAME = 'left_game'
 
 
-@dataclass
+@dataclass(frozen=True)
 class DieMessage:
     """A message telling an object to die.
 
@@ -212,6 +212,12 @@ class HitMessage:
     their effect to a target.
     """
 
+    # These get sent in large numbers during gameplay, so let's
+    # skip the per-instance dict.
+    __slots__ = ('srcnode', 'pos', 'velocity', 'magnitude',
+                 'velocity_magnitude', 'radius', 'source_player', 'kick_back',
+                 'flat_damage', 'hit_type', 'hit_subtype', 'force_direction')
+
     def __init__(self,
                  srcnode: ba.Node = None,
                  pos: Sequence[float] = None,
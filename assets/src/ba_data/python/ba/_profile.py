@@ -22,6 +22,7 @@
 from __future__ import annotations
 
 import random
+import functools
 from typing import TYPE_CHECKING
 
 import _ba
@@ -37,6 +38,11 @@ PLAYER_COLORS = [(1, 0.15, 0.15), (0.2, 1, 0.2), (0.1, 0.1, 1), (0.2, 1, 1),
                  (1, 0.8, 0.5), (0.4, 0.05, 0.05), (0.13, 0.13, 0.13),
                  (0.5, 0.5, 0.5), (1, 1, 1)]  # yapf: disable
 
+# The first 6 colors are bright-ish; the last 2 are grey and white
+# (which we avoid for highlights or we get lots of old-looking players).
+_NUM_BRIGHT_COLORS = 6
+_NUM_HIGHLIGHT_COLORS = len(PLAYER_COLORS) - 2
+
 
 def get_player_colors() -> List[Tuple[float, float, float]]:
     """Return user-selectable player colors."""
@@ -50,19 +56,13 @@ def get_player_profile_icon(profilename: str) -> str:
     """
     from ba._enums import SpecialChar
 
-    bs_config = _ba.app.config
-    icon: str
-    try:
-        is_global = bs_config['Player Profiles'][profilename]['global']
-    except Exception:
-        is_global = False
-    if is_global:
-        try:
-            icon = bs_config['Player Profiles'][profilename]['icon']
-        except Exception:
-            icon = _ba.charstr(SpecialChar.LOGO)
-    else:
-        icon = ''
+    profile = _ba.app.config.get('Player Profiles', {}).get(profilename)
+    if profile is None or not profile.get('global', False):
+        return ''
+    icon = profile.get('icon')
+    if icon is None:
+        return _ba.charstr(SpecialChar.LOGO)
+    assert isinstance(icon, str)
     return icon
 
 
@@ -71,27 +71,60 @@ def get_player_profile_colors(
     profiles: Dict[str, Dict[str, Any]] = None
 ) -> Tuple[Tuple[float, float, float], Tuple[float, float, float]]:
     """Given a profile, return colors for them."""
-    bs_config = _ba.app.config
+
+    # Named lookups against our own profiles are deterministic, so we
+    # cache those (see clear_player_profile_colors_cache()).
+    if profiles is None and profilename is not None:
+        return _get_local_player_profile_colors(profilename)
+
     if profiles is None:
-        profiles = bs_config['Player Profiles']
+        profiles = _ba.app.config['Player Profiles']
+    return _calc_player_profile_colors(profilename, profiles)
+
+
+def clear_player_profile_colors_cache() -> None:
+    """(internal)
 
+    Should be called whenever our local player profiles change.
+    """
+    _get_local_player_profile_colors.cache_clear()
+
+
+@functools.lru_cache(maxsize=256)
+def _get_local_player_profile_colors(
+    profilename: str
+) -> Tuple[Tuple[float, float, float], Tuple[float, float, float]]:
+    return _calc_player_profile_colors(profilename,
+                                       _ba.app.config['Player Profiles'])
+
+
+def _calc_player_profile_colors(
+    profilename: Optional[str], profiles: Dict[str, Dict[str, Any]]
+) -> Tuple[Tuple[float, float, float], Tuple[float, float, float]]:
     # special case - when being asked for a random color in kiosk mode,
     # always return default purple
     if _ba.app.kiosk_mode and profilename is None:
         color = (0.5, 0.4, 1.0)
         highlight = (0.4, 0.4, 0.5)
     else:
+        # Both our color and highlight fallbacks key off this.
+        # (for ascii names, summing encoded bytes gives the same result
+        # as summing ords but runs entirely in C)
+        if profilename is None:
+            name_ord_sum = 0
+        elif profilename.isascii():
+            name_ord_sum = sum(profilename.encode())
+        else:
+            name_ord_sum = sum(map(ord, profilename))
         try:
             assert profilename is not None
             color = profiles[profilename]['color']
         except Exception:
             # key off name if possible
             if profilename is None:
-                # first 6 are bright-ish
-                color = PLAYER_COLORS[random.randrange(6)]
+                color = PLAYER_COLORS[random.randrange(_NUM_BRIGHT_COLORS)]
             else:
-                # first 6 are bright-ish
-                color = PLAYER_COLORS[sum([ord(c) for c in profilename]) % 6]
+                color = PLAYER_COLORS[name_ord_sum % _NUM_BRIGHT_COLORS]
 
         try:
             assert profilename is not None
@@ -99,13 +132,11 @@ def get_player_profile_colors(
         except Exception:
             # key off name if possible
             if profilename is None:
-                # last 2 are grey and white; ignore those or we
-                # get lots of old-looking players
                 highlight = PLAYER_COLORS[random.randrange(
-                    len(PLAYER_COLORS) - 2)]
+                    _NUM_HIGHLIGHT_COLORS)]
             else:
-                highlight = PLAYER_COLORS[sum(
-                    [ord(c) + 1
-                     for c in profilename]) % (len(PLAYER_COLORS) - 2)]
+                # (equivalent to summing ord(c) + 1 for each char)
+                highlight = PLAYER_COLORS[(name_ord_sum + len(profilename)) %
+                                          _NUM_HIGHLIGHT_COLORS]
 
     return color, highlight
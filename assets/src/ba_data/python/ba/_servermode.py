@@ -29,8 +29,11 @@ from efro.terminal import Clr
 from ba._enums import TimeType
 from ba._freeforallsession import FreeForAllSession
 from ba._dualteamsession import DualTeamSession
+from ba._lang import Lstr
+from ba._netutils import serverget
 from bacommon.servermanager import (ServerCommand, StartServerModeCommand,
-                                    ShutdownCommand, ShutdownReason)
+                                    ShutdownCommand, ShutdownReason,
+                                    decode_server_command)
 import _ba
 
 if TYPE_CHECKING:
@@ -41,9 +44,15 @@ if TYPE_CHECKING:
 
 def _cmd(command_data: bytes) -> None:
     """Handle commands coming in from our server manager parent process."""
-    import pickle
-    command = pickle.loads(command_data)
-    assert isinstance(command, ServerCommand)
+    command: ServerCommand
+    if command_data[:1] == b'\x80':
+        # Older server managers send pickled commands; accept those for
+        # now so existing setups keep working.
+        import pickle
+        command = pickle.loads(command_data)
+        assert isinstance(command, ServerCommand)
+    else:
+        command = decode_server_command(command_data)
 
     if isinstance(command, StartServerModeCommand):
         assert _ba.app.server is None
@@ -71,8 +80,9 @@ class ServerController:
         self._config = config
         self._playlist_name = '__default__'
         self._ran_access_check = False
-        self._prep_timer: Optional[ba.Timer] = None
-        self._next_stuck_login_warn_time = time.time() + 10.0
+        self._prepped = False
+        self._sign_in_check_timer: Optional[ba.Timer] = None
+        self._next_stuck_login_warn_time = time.monotonic() + 10.0
         self._first_run = True
         self._shutdown_reason: Optional[ShutdownReason] = None
         self._executing_shutdown = False
@@ -81,17 +91,13 @@ class ServerController:
         # we'll need to do that first if so.
         self._playlist_fetch_running = self._config.playlist_code is not None
         self._playlist_fetch_sent_request = False
-        self._playlist_fetch_got_response = False
         self._playlist_fetch_code = -1
 
-        # Now sit around doing any pre-launch prep such as waiting for
-        # account sign-in or fetching playlists; this will kick off the
-        # session once done.
+        # Now do any pre-launch prep such as waiting for account sign-in
+        # or fetching playlists; this will kick off the session once done.
+        # (sign-in and playlist-fetch completion re-trigger this directly)
         with _ba.Context('ui'):
-            self._prep_timer = _ba.Timer(0.25,
-                                         self._prepare_to_serve,
-                                         timetype=TimeType.REAL,
-                                         repeat=True)
+            _ba.pushcall(self._prepare_to_serve)
 
     def shutdown(self, reason: ShutdownReason, immediate: bool) -> None:
         """Set the app to quit either now or at the next clean opportunity."""
@@ -104,6 +110,12 @@ class ServerController:
                   f' server process will exit at the next clean opportunity.'
                   f'{Clr.RST}')
 
+    def on_account_state_changed(self) -> None:
+        """Called when our account sign-in state changes."""
+        if not self._prepped and _ba.get_account_state() == 'signed_in':
+            with _ba.Context('ui'):
+                _ba.pushcall(self._prepare_to_serve)
+
     def handle_transition(self) -> bool:
         """Handle transitioning to a new ba.Session or quitting the app.
 
@@ -118,7 +130,6 @@ class ServerController:
         return False
 
     def _execute_shutdown(self) -> None:
-        from ba._lang import Lstr
         if self._executing_shutdown:
             return
         self._executing_shutdown = True
@@ -142,7 +153,6 @@ class ServerController:
 
     def _run_access_check(self) -> None:
         """Check with the master server to see if we're likely joinable."""
-        from ba._netutils import serverget
         serverget(
             'bsAccessCheck',
             {
@@ -166,24 +176,43 @@ class ServerController:
                       f' Your server does not appear to be joinable'
                       f' from the internet.{Clr.RST}')
 
+    def _check_sign_in(self) -> None:
+        """Low-frequency watchdog while we wait for account sign-in."""
+        self._sign_in_check_timer = None
+        if _ba.get_account_state() == 'signed_in':
+            # We should have heard about this via on_account_state_changed()
+            # but no harm in covering our bases.
+            self._prepare_to_serve()
+            return
+
+        # Signing in to the local server account should not take long;
+        # complain if it does...
+        curtime = time.monotonic()
+        if curtime > self._next_stuck_login_warn_time:
+            print('Still waiting for account sign-in...')
+            self._next_stuck_login_warn_time = curtime + 10.0
+        with _ba.Context('ui'):
+            self._sign_in_check_timer = _ba.Timer(5.0,
+                                                  self._check_sign_in,
+                                                  timetype=TimeType.REAL)
+
     def _prepare_to_serve(self) -> None:
-        signed_in = _ba.get_account_state() == 'signed_in'
-        if not signed_in:
-
-            # Signing in to the local server account should not take long;
-            # complain if it does...
-            curtime = time.time()
-            if curtime > self._next_stuck_login_warn_time:
-                print('Still waiting for account sign-in...')
-                self._next_stuck_login_warn_time = curtime + 10.0
+        if self._prepped:
             return
 
-        can_launch = False
+        if _ba.get_account_state() != 'signed_in':
+            # We'll get called again once sign-in completes; in the
+            # meantime just keep an eye out for a stuck login.
+            if self._sign_in_check_timer is None:
+                with _ba.Context('ui'):
+                    self._sign_in_check_timer = _ba.Timer(
+                        5.0, self._check_sign_in, timetype=TimeType.REAL)
+            return
+        self._sign_in_check_timer = None
 
         # If we're fetching a playlist, we need to do that first.
-        if not self._playlist_fetch_running:
-            can_launch = True
-        else:
+        # (our response handler will call us again once it's done)
+        if self._playlist_fetch_running:
             if not self._playlist_fetch_sent_request:
                 print(f'{Clr.SBLU}Requesting shared-playlist'
                       f' {self._config.playlist_code}...{Clr.RST}')
@@ -196,14 +225,10 @@ class ServerController:
                     callback=self._on_playlist_fetch_response)
                 _ba.run_transactions()
                 self._playlist_fetch_sent_request = True
+            return
 
-            if self._playlist_fetch_got_response:
-                self._playlist_fetch_running = False
-                can_launch = True
-
-        if can_launch:
-            self._prep_timer = None
-            _ba.pushcall(self._launch_server_session)
+        self._prepped = True
+        _ba.pushcall(self._launch_server_session)
 
     def _on_playlist_fetch_response(
         self,
@@ -219,9 +244,10 @@ class ServerController:
             'ffa' if result['playlistType'] == 'Free-for-All' else '??')
         plistname = result['playlistName']
         print(f'{Clr.SBLU}Got playlist: "{plistname}" ({typename}).{Clr.RST}')
-        self._playlist_fetch_got_response = True
+        self._playlist_fetch_running = False
         self._config.session_type = typename
         self._playlist_name = (result['playlistName'])
+        self._prepare_to_serve()
 
     def _get_session_type(self) -> Type[ba.Session]:
         # Convert string session type to the class.
@@ -263,7 +289,9 @@ class ServerController:
         app.teams_series_length = self._config.teams_series_length
         app.ffa_series_length = self._config.ffa_series_length
 
-        # Call set-enabled last (will push state to the cloud).
+        # Stage all public-party state first and call set-enabled last;
+        # it pushes everything to the cloud in a single go, so the other
+        # setters here don't each cost a round trip.
         _ba.set_public_party_max_size(self._config.max_party_size)
         _ba.set_public_party_name(self._config.party_name)
         _ba.set_public_party_stats_url(self._config.stats_url)
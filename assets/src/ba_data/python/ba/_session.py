@@ -480,6 +480,9 @@ class Session:
             return None
 
         if isinstance(msg, PlayerProfilesChangedMessage):
+            from ba._profile import clear_player_profile_colors_cache
+            clear_player_profile_colors_cache()
+
             # If we have a current activity with a lobby, ask it to reload
             # profiles.
             with _ba.Context(self):
@@ -57,7 +57,7 @@ from ba._music import do_play_music
 from ba._netutils import serverget, serverput, get_ip_address_type
 from ba._powerup import get_default_powerup_distribution
 from ba._profile import (get_player_profile_colors, get_player_profile_icon,
-                         get_player_colors)
+                         get_player_colors, clear_player_profile_colors_cache)
 from ba._tips import get_next_tip
 from ba._playlist import (get_default_free_for_all_playlist,
                           get_default_teams_playlist, filter_playlist)
@@ -27,16 +27,37 @@ from typing import TYPE_CHECKING
 import ba
 
 if TYPE_CHECKING:
-    from typing import Optional
+    from typing import Optional, Dict, Tuple
+
+# Where to send users to rate us, keyed by platform and subplatform
+# (a subplatform of None applies to any subplatform).
+_RATING_URLS: Dict[Tuple[str, Optional[str]], str] = {
+    ('android', 'google'):
+        'market://details?id=net.froemling.ballisticacore',
+    ('android', 'cardboard'):
+        'market://details?id=net.froemling.ballisticacorecb',
+    ('mac', None):
+        'macappstore://itunes.apple.com/app/id416482767?ls=1&mt=12',
+}  # yapf: disable
+
+
+def _do_rating(dlg: ba.Widget, url: str) -> None:
+    ba.open_url(url)
+    ba.containerwidget(edit=dlg, transition='out_left')
+
+
+def _close(dlg: ba.Widget) -> None:
+    ba.containerwidget(edit=dlg, transition='out_left')
 
 
 def ask_for_rating() -> Optional[ba.Widget]:
     """(internal)"""
     app = ba.app
-    platform = app.platform
-    subplatform = app.subplatform
-    if not (platform == 'mac' or (platform == 'android'
-                                  and subplatform in ['google', 'cardboard'])):
+
+    # We can only ask for ratings where we know where to send people.
+    url = _RATING_URLS.get((app.platform, app.subplatform),
+                           _RATING_URLS.get((app.platform, None)))
+    if url is None:
         return None
     width = 700
     height = 400
@@ -65,33 +86,17 @@ def ask_for_rating() -> Optional[ba.Widget]:
                   h_align='center',
                   v_align='center')
 
-    def do_rating() -> None:
-        if platform == 'android':
-            if subplatform == 'google':
-                url = 'market://details?id=net.froemling.ballisticacore'
-            else:
-                url = 'market://details?id=net.froemling.ballisticacorecb'
-        else:
-            url = 'macappstore://itunes.apple.com/app/id416482767?ls=1&mt=12'
-
-        ba.open_url(url)
-        ba.containerwidget(edit=dlg, transition='out_left')
-
     ba.buttonwidget(parent=dlg,
                     position=(60, 20),
                     size=(200, 60),
                     label=ba.Lstr(resource='wellSureText'),
                     autoselect=True,
-                    on_activate_call=do_rating)
-
-    def close() -> None:
-        ba.containerwidget(edit=dlg, transition='out_left')
-
+                    on_activate_call=ba.Call(_do_rating, dlg, url))
     btn = ba.buttonwidget(parent=dlg,
                           position=(width - 270, 20),
                           size=(200, 60),
                           label=ba.Lstr(resource='noThanksText'),
                           autoselect=True,
-                          on_activate_call=close)
+                          on_activate_call=ba.Call(_close, dlg))
     ba.containerwidget(edit=dlg, cancel_button=btn, selected_child=btn)
     return dlg
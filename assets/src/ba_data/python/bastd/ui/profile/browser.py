@@ -284,9 +284,13 @@ class ProfileBrowserWindow(ba.Window):
         # pylint: disable=too-many-locals
         from ba.internal import (PlayerProfilesChangedMessage,
                                  get_player_profile_colors,
-                                 get_player_profile_icon)
+                                 get_player_profile_icon,
+                                 clear_player_profile_colors_cache)
         old_selection = self._selected_profile
 
+        # We're generally called after profiles have been edited.
+        clear_player_profile_colors_cache()
+
         # Delete old.
         while self._profile_widgets:
             self._profile_widgets.pop().delete()
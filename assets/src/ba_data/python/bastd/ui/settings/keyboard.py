@@ -28,14 +28,48 @@ import _ba
 import ba
 
 if TYPE_CHECKING:
-    from typing import Dict, Tuple, Any, Optional
+    from typing import Dict, Tuple, Any, List
+
+# All buttons we let the user configure.
+_BUTTON_NAMES = ('buttonJump', 'buttonPunch', 'buttonBomb', 'buttonPickUp',
+                 'buttonStart', 'buttonStart2', 'buttonUp', 'buttonDown',
+                 'buttonLeft', 'buttonRight')
+
+# Button textures we've looked up, by name. These all live in the ui
+# context (which is the only place this window gets built).
+_BUTTON_TEXTURES: Dict[str, ba.Texture] = {}
+
+
+def _button_texture(name: str) -> ba.Texture:
+    tex = _BUTTON_TEXTURES.get(name)
+    if tex is None:
+        tex = _BUTTON_TEXTURES[name] = ba.gettexture(name)
+    return tex
 
 
 class ConfigKeyboardWindow(ba.Window):
     """Window for configuring keyboards."""
 
+    _CONFIGURING_TEXT_RES = 'configKeyboardWindow.configuringText'
+    _KEYBOARD2_NOTE_TEXT_RES = 'configKeyboardWindow.keyboard2NoteText'
+
+    # Our movement and action button clusters, in creation order.
+    # Each entry is button name, texture name, color, and position offset
+    # from the cluster center (in multiples of the button spacing).
+    _MOVE_BUTTONS = (
+        ('buttonUp', 'upButton', (0.4, 0.4, 0.8), 0.0, 0.95),
+        ('buttonLeft', 'leftButton', (0.4, 0.4, 0.8), -1.2, 0.0),
+        ('buttonRight', 'rightButton', (0.4, 0.4, 0.8), 1.2, 0.0),
+        ('buttonDown', 'downButton', (0.4, 0.4, 0.8), 0.0, -0.95),
+    )
+    _ACTION_BUTTONS = (
+        ('buttonPickUp', 'buttonPickUp', (0.6, 0.4, 0.8), 0.0, 0.95),
+        ('buttonPunch', 'buttonPunch', (0.7, 0.5, 0.1), -1.2, 0.0),
+        ('buttonBomb', 'buttonBomb', (0.5, 0.2, 0.1), 1.2, 0.0),
+        ('buttonJump', 'buttonJump', (0.2, 0.5, 0.2), 0.0, -0.95),
+    )
+
     def __init__(self, c: ba.InputDevice, transition: str = 'in_right'):
-        self._r = 'configKeyboardWindow'
         self._input = c
         self._name = self._input.name
         self._unique_id = self._input.unique_identifier
@@ -64,13 +98,10 @@ class ConfigKeyboardWindow(ba.Window):
             widget.delete()
 
         # fill our temp config with present values
-        self._settings: Dict[str, int] = {}
-        for button in [
-                'buttonJump', 'buttonPunch', 'buttonBomb', 'buttonPickUp',
-                'buttonStart', 'buttonStart2', 'buttonUp', 'buttonDown',
-                'buttonLeft', 'buttonRight'
-        ]:
-            self._settings[button] = get_device_value(self._input, button)
+        self._settings: Dict[str, int] = {
+            button: get_device_value(self._input, button)
+            for button in _BUTTON_NAMES
+        }
 
         cancel_button = ba.buttonwidget(parent=self._root_widget,
                                         autoselect=True,
@@ -99,7 +130,7 @@ class ConfigKeyboardWindow(ba.Window):
         ba.textwidget(parent=self._root_widget,
                       position=(self._width * 0.5, v + 15),
                       size=(0, 0),
-                      text=ba.Lstr(resource=self._r + '.configuringText',
+                      text=ba.Lstr(resource=self._CONFIGURING_TEXT_RES,
                                    subs=[('${DEVICE}', self._displayname)]),
                       color=ba.app.title_color,
                       h_align='center',
@@ -114,8 +145,7 @@ class ConfigKeyboardWindow(ba.Window):
             ba.textwidget(parent=self._root_widget,
                           position=(0, v + 19),
                           size=(self._width, 50),
-                          text=ba.Lstr(resource=self._r +
-                                       '.keyboard2NoteText'),
+                          text=ba.Lstr(resource=self._KEYBOARD2_NOTE_TEXT_RES),
                           scale=0.7,
                           maxwidth=self._width * 0.75,
                           max_height=110,
@@ -127,59 +157,27 @@ class ConfigKeyboardWindow(ba.Window):
         v -= self._spacing * 2.2
         v += 25
         v -= 42
-        h_offs = 160
         dist = 70
-        d_color = (0.4, 0.4, 0.8)
-        self._capture_button(pos=(h_offs, v + 0.95 * dist),
-                             color=d_color,
-                             button='buttonUp',
-                             texture=ba.gettexture('upButton'),
-                             scale=1.0)
-        self._capture_button(pos=(h_offs - 1.2 * dist, v),
-                             color=d_color,
-                             button='buttonLeft',
-                             texture=ba.gettexture('leftButton'),
-                             scale=1.0)
-        self._capture_button(pos=(h_offs + 1.2 * dist, v),
-                             color=d_color,
-                             button='buttonRight',
-                             texture=ba.gettexture('rightButton'),
-                             scale=1.0)
-        self._capture_button(pos=(h_offs, v - 0.95 * dist),
-                             color=d_color,
-                             button='buttonDown',
-                             texture=ba.gettexture('downButton'),
-                             scale=1.0)
+        h_offs = 160
+        for button, texname, color, xoffs, yoffs in self._MOVE_BUTTONS:
+            self._capture_button(pos=(h_offs + xoffs * dist, v + yoffs * dist),
+                                 color=color,
+                                 button=button,
+                                 texture=_button_texture(texname))
 
         if self._unique_id == '#2':
             self._capture_button(pos=(self._width * 0.5, v + 0.1 * dist),
                                  color=(0.4, 0.4, 0.6),
                                  button='buttonStart',
-                                 texture=ba.gettexture('startButton'),
+                                 texture=_button_texture('startButton'),
                                  scale=0.8)
 
         h_offs = self._width - 160
-
-        self._capture_button(pos=(h_offs, v + 0.95 * dist),
-                             color=(0.6, 0.4, 0.8),
-                             button='buttonPickUp',
-                             texture=ba.gettexture('buttonPickUp'),
-                             scale=1.0)
-        self._capture_button(pos=(h_offs - 1.2 * dist, v),
-                             color=(0.7, 0.5, 0.1),
-                             button='buttonPunch',
-                             texture=ba.gettexture('buttonPunch'),
-                             scale=1.0)
-        self._capture_button(pos=(h_offs + 1.2 * dist, v),
-                             color=(0.5, 0.2, 0.1),
-                             button='buttonBomb',
-                             texture=ba.gettexture('buttonBomb'),
-                             scale=1.0)
-        self._capture_button(pos=(h_offs, v - 0.95 * dist),
-                             color=(0.2, 0.5, 0.2),
-                             button='buttonJump',
-                             texture=ba.gettexture('buttonJump'),
-                             scale=1.0)
+        for button, texname, color, xoffs, yoffs in self._ACTION_BUTTONS:
+            self._capture_button(pos=(h_offs + xoffs * dist, v + yoffs * dist),
+                                 color=color,
+                                 button=button,
+                                 texture=_button_texture(texname))
 
     def _capture_button(self,
                         pos: Tuple[float, float],
@@ -188,37 +186,39 @@ class ConfigKeyboardWindow(ba.Window):
                         button: str,
                         scale: float = 1.0) -> None:
         base_size = 79
+        size = base_size * scale
+        half_size = size * 0.5
         btn = ba.buttonwidget(parent=self._root_widget,
                               autoselect=True,
-                              position=(pos[0] - base_size * 0.5 * scale,
-                                        pos[1] - base_size * 0.5 * scale),
-                              size=(base_size * scale, base_size * scale),
+                              position=(pos[0] - half_size,
+                                        pos[1] - half_size),
+                              size=(size, size),
                               texture=texture,
                               label='',
                               color=color)
 
         # do this deferred so it shows up on top of other buttons
-        def doit() -> None:
-            uiscale = 0.66 * scale * 2.0
-            maxwidth = 76.0 * scale
-            txt = ba.textwidget(parent=self._root_widget,
-                                position=(pos[0] + 0.0 * scale,
-                                          pos[1] - (57.0 - 18.0) * scale),
-                                color=(1, 1, 1, 0.3),
-                                size=(0, 0),
-                                h_align='center',
-                                v_align='top',
-                                scale=uiscale,
-                                maxwidth=maxwidth,
-                                text=self._input.get_button_name(
-                                    self._settings[button]))
-            ba.buttonwidget(edit=btn,
-                            autoselect=True,
-                            on_activate_call=ba.Call(AwaitKeyboardInputWindow,
-                                                     button, txt,
-                                                     self._settings))
-
-        ba.pushcall(doit)
+        ba.pushcall(
+            ba.Call(self._finish_capture_button, btn, pos, scale, button))
+
+    def _finish_capture_button(self, btn: ba.Widget, pos: Tuple[float, float],
+                               scale: float, button: str) -> None:
+        uiscale = 0.66 * scale * 2.0
+        maxwidth = 76.0 * scale
+        txt = ba.textwidget(parent=self._root_widget,
+                            position=(pos[0], pos[1] - (57.0 - 18.0) * scale),
+                            color=(1, 1, 1, 0.3),
+                            size=(0, 0),
+                            h_align='center',
+                            v_align='top',
+                            scale=uiscale,
+                            maxwidth=maxwidth,
+                            text=self._input.get_button_name(
+                                self._settings[button]))
+        ba.buttonwidget(edit=btn,
+                        autoselect=True,
+                        on_activate_call=ba.Call(AwaitKeyboardInputWindow,
+                                                 button, txt, self._settings))
 
     def _cancel(self) -> None:
         from bastd.ui.settings.controls import ControlsSettingsWindow
@@ -238,9 +238,10 @@ class ConfigKeyboardWindow(ba.Window):
         dst2.clear()
 
         # Store any values that aren't -1.
-        for key, val in list(self._settings.items()):
-            if val != -1:
-                dst2[key] = val
+        dst2.update({
+            key: val
+            for key, val in self._settings.items() if val != -1
+        })
 
         # If we're allowed to phone home, send this config so we can generate
         # more defaults in the future.
@@ -280,26 +281,33 @@ class AwaitKeyboardInputWindow(ba.Window):
                       h_align='center',
                       v_align='top')
 
-        self._counter = 5
+        countdown = 5
         self._count_down_text = ba.textwidget(parent=self._root_widget,
                                               h_align='center',
                                               position=(0, height - 110),
                                               size=(width, 25),
                                               color=(1, 1, 1, 0.3),
-                                              text=str(self._counter))
-        self._decrement_timer: Optional[ba.Timer] = ba.Timer(
-            1.0,
-            ba.Call(self._decrement),
-            repeat=True,
-            timetype=ba.TimeType.REAL)
+                                              text=str(countdown))
+
+        # Schedule our full countdown up front. Note that these strong-ref
+        # us; this is what keeps us alive until we die.
+        self._countdown_timers: List[ba.Timer] = [
+            ba.Timer(float(i),
+                     ba.Call(self._set_count, countdown - i),
+                     timetype=ba.TimeType.REAL) for i in range(1, countdown)
+        ]
+        self._countdown_timers.append(
+            ba.Timer(float(countdown),
+                     ba.Call(self._die),
+                     timetype=ba.TimeType.REAL))
         _ba.capture_keyboard_input(ba.WeakCall(self._button_callback))
 
     def __del__(self) -> None:
         _ba.release_keyboard_input()
 
     def _die(self) -> None:
-        # this strong-refs us; killing it allow us to die now
-        self._decrement_timer = None
+        # these strong-ref us; killing them allows us to die now
+        self._countdown_timers = []
         if self._root_widget:
             ba.containerwidget(edit=self._root_widget, transition='out_left')
 
@@ -311,9 +319,5 @@ class AwaitKeyboardInputWindow(ba.Window):
             ba.playsound(ba.getsound('gunCocking'))
             self._die()
 
-    def _decrement(self) -> None:
-        self._counter -= 1
-        if self._counter >= 1:
-            ba.textwidget(edit=self._count_down_text, text=str(self._counter))
-        else:
-            self._die()
+    def _set_count(self, count: int) -> None:
+        ba.textwidget(edit=self._count_down_text, text=str(count))
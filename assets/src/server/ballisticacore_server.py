@@ -271,11 +271,10 @@ class ServerManagerApp:
 
         Must be called from the server process thread.
         """
-        import pickle
         assert current_thread() is self._process_thread
         assert self._process is not None
         assert self._process.stdin is not None
-        val = repr(pickle.dumps(command))
+        val = repr(command.to_bytes())
         assert '\n' not in val
         execcode = (f'import ba._servermode;'
                     f' ba._servermode._cmd({val})\n').encode()
@@ -0,0 +1,101 @@
+# Copyright (c) 2011-2020 Eric Froemling
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+"""Testing server manager command functionality."""
+
+from __future__ import annotations
+
+import json
+import pickle
+
+import pytest
+
+from bacommon.servermanager import (ServerConfig, StartServerModeCommand,
+                                    ShutdownCommand, ShutdownReason,
+                                    decode_server_command)
+
+
+def test_round_trip() -> None:
+    """Testing commands surviving serialization."""
+    cmd = StartServerModeCommand(
+        ServerConfig(party_name='Fête für alle ☃',
+                     port=43211,
+                     max_party_size=8,
+                     stats_url='http://example.com/${ACCOUNT}'))
+    assert decode_server_command(cmd.to_bytes()) == cmd
+
+    for reason in ShutdownReason:
+        for immediate in (False, True):
+            cmd2 = ShutdownCommand(reason=reason, immediate=immediate)
+            assert decode_server_command(cmd2.to_bytes()) == cmd2
+
+
+def test_rejects_unknown() -> None:
+    """Testing that unrecognized data is rejected."""
+    data = ShutdownCommand(reason=ShutdownReason.NONE,
+                           immediate=False).to_bytes()
+    with pytest.raises(ValueError):
+        decode_server_command(b'')
+    with pytest.raises(ValueError):
+        decode_server_command(b'\xff' + data[1:])
+    with pytest.raises(ValueError):
+        decode_server_command(bytes((0, )) + data[1:])
+
+    # Legacy pickled commands are handled by the receiver before they
+    # get here; they should never be mistaken for our own format.
+    pickled = pickle.dumps(
+        ShutdownCommand(reason=ShutdownReason.NONE, immediate=False))
+    assert pickled[:1] == b'\x80'
+    with pytest.raises(ValueError):
+        decode_server_command(pickled)
+
+    # Payloads must be dicts.
+    for payload in (b'[]', b'"config"', b'null', b'3'):
+        with pytest.raises(ValueError):
+            decode_server_command(b'\x01' + payload)
+
+
+def test_bad_types() -> None:
+    """Testing that badly typed values are rejected."""
+    with pytest.raises(TypeError):
+        decode_server_command(b'\x01' + json.dumps({
+            'config': {
+                'port': '43210'
+            }
+        }).encode())
+    with pytest.raises(TypeError):
+        decode_server_command(b'\x01' + json.dumps({
+            'config': {
+                'party_is_public': 1
+            }
+        }).encode())
+    with pytest.raises(TypeError):
+        decode_server_command(b'\x01{"config": []}')
+    with pytest.raises(TypeError):
+        decode_server_command(b'\x02{"reason": "none", "immediate": 0}')
+
+
+def test_undecodable() -> None:
+    """Testing that garbage or incomplete data gives clean ValueErrors."""
+    for data in (b'\x01', b'\x01{', b'\x01\xff\xfe', b'\x01{}',
+                 b'\x02{"reason": "none"}',
+                 b'\x02{"reason": "bogus", "immediate": true}'):
+        with pytest.raises(ValueError):
+            decode_server_command(data)
@@ -22,7 +22,7 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
 import pytest
@@ -30,7 +30,7 @@ import pytest
 from efro.dataclassutils import dataclass_assign, dataclass_validate
 
 if TYPE_CHECKING:
-    from typing import Optional
+    from typing import Optional, List
 
 
 def test_assign() -> None:
@@ -120,6 +120,31 @@ def test_assign() -> None:
     with pytest.raises(TypeError):
         dataclass_assign(tclass, {'ofval': 1})
 
+    # Subclasses of allowed types don't count either.
+    class _IntSubclass(int):
+        pass
+
+    with pytest.raises(TypeError):
+        dataclass_assign(tclass, {'ival': _IntSubclass(1)})
+
+
+def test_unsupported_types() -> None:
+    """Testing dataclasses with unsupported field types."""
+
+    @dataclass
+    class _TestClass:
+        ival: int = 0
+        lval: List[int] = field(default_factory=list)
+
+    tclass = _TestClass()
+
+    # Unsupported fields should make the whole dataclass unusable
+    # (even if we're not touching them).
+    with pytest.raises(TypeError):
+        dataclass_assign(tclass, {'ival': 1})
+    with pytest.raises(TypeError):
+        dataclass_validate(tclass)
+
 
 def test_validate() -> None:
     """Testing validation."""
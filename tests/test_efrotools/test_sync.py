@@ -0,0 +1,313 @@
+# Copyright (c) 2011-2020 Eric Froemling
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# -----------------------------------------------------------------------------
+"""Testing sync functionality."""
+
+from __future__ import annotations
+
+import os
+import hashlib
+from typing import TYPE_CHECKING
+
+import pytest
+
+from efrotools import sync
+from efrotools.sync import Mode, HashCache, sync_paths, check_path
+
+if TYPE_CHECKING:
+    from typing import Dict, Any
+    from pathlib import Path
+
+_SRC_DATA = b'"""Test module."""\nfoo = 1\n'
+
+
+def _snapshot(root: Path) -> Dict[str, bytes]:
+    """Return the contents of all files under a dir."""
+    return {
+        str(path.relative_to(root)): path.read_bytes()
+        for path in root.rglob('*') if path.is_file()
+    }
+
+
+def _make_tree(tmp_path: Path) -> Path:
+    """Set up a src tree and an empty dst dir."""
+    src, dst = tmp_path / 'src', tmp_path / 'dst'
+    (src / 'pkg').mkdir(parents=True)
+    dst.mkdir()
+    (src / 'mod.py').write_bytes(_SRC_DATA)
+    (src / 'pkg' / '__init__.py').write_bytes(b'')
+    (src / 'pkg' / 'sub.py').write_bytes(b'bar = 2\n')
+    return tmp_path
+
+
+def _fail(*args: Any, **kwargs: Any) -> Any:
+    raise RuntimeError('should not be called')
+
+
+def test_round_trip(tmp_path: Path) -> None:
+    """Testing pulls, pushes and checks on a simple tree."""
+    base = _make_tree(tmp_path)
+    src, dst = base / 'src', base / 'dst'
+
+    # Initial pull should copy everything across with markers.
+    assert sync_paths('src', src, dst, Mode.PULL) == 3
+    assert check_path(dst) == 3
+    dstdata = (dst / 'mod.py').read_bytes()
+    assert dstdata.startswith(b'# Synced from src.\n# EFRO_SYNC_HASH2=')
+    assert dstdata.endswith(_SRC_DATA)
+
+    # Src changes should come across and orphans go away.
+    (src / 'mod.py').write_bytes(_SRC_DATA + b'baz = 3\n')
+    (dst / 'stray.py').write_bytes(b'')
+    sync_paths('src', src, dst, Mode.PULL)
+    assert (dst / 'mod.py').read_bytes().endswith(b'baz = 3\n')
+    assert not (dst / 'stray.py').exists()
+    assert check_path(dst) == 3
+
+    # Dst changes should trip checks and pulls but get pushed by full.
+    subdata = (dst / 'pkg' / 'sub.py').read_bytes() + b'eep = 4\n'
+    (dst / 'pkg' / 'sub.py').write_bytes(subdata)
+    with pytest.raises(RuntimeError, match='changed since last sync'):
+        check_path(dst)
+    with pytest.raises(RuntimeError, match='run a FULL mode sync'):
+        sync_paths('src', src, dst, Mode.PULL)
+    sync_paths('src', src, dst, Mode.FULL)
+    assert (src / 'pkg' / 'sub.py').read_bytes() == b'bar = 2\neep = 4\n'
+    assert check_path(dst) == 3
+
+    # Identical changes on both sides should just fix the marker.
+    for root in (src, dst):
+        path = root / 'pkg' / '__init__.py'
+        path.write_bytes(path.read_bytes() + b'# hello\n')
+    sync_paths('src', src, dst, Mode.PULL)
+    assert check_path(dst) == 3
+
+    # And a final full sync on a healthy tree should change nothing.
+    before = _snapshot(base)
+    sync_paths('src', src, dst, Mode.FULL)
+    assert _snapshot(base) == before
+
+    with pytest.raises(ValueError):
+        sync_paths('src', src, dst, Mode.CHECK)
+
+
+def test_single_file(tmp_path: Path) -> None:
+    """Testing syncs and checks of individual files."""
+    base = _make_tree(tmp_path)
+    srcfile, dstfile = base / 'src' / 'mod.py', base / 'dst' / 'mod.py'
+    assert sync_paths('src', srcfile, dstfile, Mode.PULL) == 1
+    assert check_path(dstfile) == 1
+    dstfile.write_bytes(dstfile.read_bytes() + b'eep = 4\n')
+    with pytest.raises(RuntimeError, match='changed since last sync'):
+        check_path(dstfile)
+
+    # Files we wouldn't sync are ignored like they are in dirs.
+    (base / 'dst' / 'notes.txt').write_bytes(b'hello\n')
+    assert check_path(base / 'dst' / 'notes.txt') == 0
+
+
+def test_check_missing_dst(tmp_path: Path) -> None:
+    """Checking something that hasn't been synced yet should be a no-op."""
+    assert check_path(tmp_path / 'nonexistent') == 0
+    assert check_path(tmp_path / 'nonexistent.py') == 0
+
+
+def test_orphans_case_insensitive(tmp_path: Path, monkeypatch: Any) -> None:
+    """Dst files matching src in all but case must not count as orphans."""
+    base = _make_tree(tmp_path)
+    src, dst = base / 'src', base / 'dst'
+    sync_paths('src', src, dst, Mode.PULL)
+
+    # Fake a case-insensitive filesystem where src renamed Mod.py to
+    # mod.py and the pull wrote over the existing dst file in place.
+    (dst / 'mod.py').rename(dst / 'Mod.py')
+    realexists = os.path.exists
+
+    def _exists(path: Any) -> bool:
+        dirname, fname = os.path.split(path)
+        return realexists(path) or (os.path.isdir(dirname)
+                                    and fname.lower() in os.listdir(dirname))
+
+    monkeypatch.setattr(os.path, 'exists', _exists)
+    sync_paths('src', src, dst, Mode.PULL)
+    assert (dst / 'Mod.py').exists()
+
+
+def _warm_cache(src: Path, dst: Path, cachepath: Path) -> None:
+    """Age all files out of the racy window and cache them."""
+    for path in list(src.rglob('*')) + list(dst.rglob('*')):
+        mtime_ns = path.stat().st_mtime_ns - 60 * 10**9
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    hashcache = HashCache(cachepath)
+    sync_paths('src', src, dst, Mode.FULL, hashcache)
+    hashcache.write()
+
+
+def test_hash_cache(tmp_path: Path, monkeypatch: Any) -> None:
+    """Testing that unchanged files are never read with a warm cache."""
+    base = _make_tree(tmp_path)
+    src, dst = base / 'src', base / 'dst'
+    cachepath = base / '.cache-sync'
+    sync_paths('src', src, dst, Mode.PULL)
+    _warm_cache(src, dst, cachepath)
+
+    # With everything cached, syncs and checks shouldn't read anything.
+    with monkeypatch.context() as patch:
+        patch.setattr(sync, '_read_and_hash', _fail)
+        patch.setattr(sync, '_read_file', _fail)
+        patch.setattr(sync, 'get_dst_file_info', _fail)
+        sync_paths('src', src, dst, Mode.FULL, HashCache(cachepath))
+        assert check_path(dst, HashCache(cachepath)) == 3
+
+    # A same-size edit with a new mtime must not be served from the cache.
+    srcfile = src / 'pkg' / 'sub.py'
+    srcstat = srcfile.stat()
+    srcfile.write_bytes(b'bar = 5\n')
+    os.utime(srcfile, ns=(srcstat.st_atime_ns, srcstat.st_mtime_ns + 10**9))
+    sync_paths('src', src, dst, Mode.PULL, HashCache(cachepath))
+    assert (dst / 'pkg' / 'sub.py').read_bytes().endswith(b'bar = 5\n')
+    _warm_cache(src, dst, cachepath)
+
+    # Same goes for dst.
+    dstfile = dst / 'pkg' / 'sub.py'
+    dststat = dstfile.stat()
+    dstfile.write_bytes(dstfile.read_bytes()[:-2] + b'6\n')
+    os.utime(dstfile, ns=(dststat.st_atime_ns, dststat.st_mtime_ns + 10**9))
+    with pytest.raises(RuntimeError, match='changed since last sync'):
+        check_path(dst, HashCache(cachepath))
+    sync_paths('src', src, dst, Mode.FULL, HashCache(cachepath))
+    assert srcfile.read_bytes() == b'bar = 6\n'
+
+
+def test_hash_cache_racy(tmp_path: Path) -> None:
+    """Files modified just before a cache write must not be trusted."""
+    base = _make_tree(tmp_path)
+    src, dst = base / 'src', base / 'dst'
+    cachepath = base / '.cache-sync'
+    hashcache = HashCache(cachepath)
+    sync_paths('src', src, dst, Mode.PULL, hashcache)
+    hashcache.write()
+
+    # A same-size edit within the filesystem's mtime granularity leaves
+    # size and mtime untouched; simulate that.
+    dstfile = dst / 'pkg' / 'sub.py'
+    dststat = dstfile.stat()
+    dstfile.write_bytes(dstfile.read_bytes()[:-2] + b'6\n')
+    os.utime(dstfile, ns=(dststat.st_atime_ns, dststat.st_mtime_ns))
+    with pytest.raises(RuntimeError, match='changed since last sync'):
+        check_path(dst, HashCache(cachepath))
+
+
+def test_repeated_push_rewrites_marker(tmp_path: Path,
+                                       monkeypatch: Any) -> None:
+    """Pushes should rewrite the marker in place instead of the file."""
+    base = _make_tree(tmp_path)
+    src, dst = base / 'src', base / 'dst'
+    sync_paths('src', src, dst, Mode.PULL)
+    monkeypatch.setattr(sync, '_write_dst', _fail)
+    dstfile = dst / 'mod.py'
+    for i in range(3):
+        dstfile.write_bytes(dstfile.read_bytes() + f'x{i} = {i}\n'.encode())
+        sync_paths('src', src, dst, Mode.FULL)
+        assert dstfile.read_bytes().endswith((src / 'mod.py').read_bytes())
+        assert check_path(dst) == 3
+    assert (src / 'mod.py').read_bytes() == (_SRC_DATA +
+                                             b'x0 = 0\nx1 = 1\nx2 = 2\n')
+
+
+def test_conflict_leaves_tree_untouched(tmp_path: Path) -> None:
+    """A conflict anywhere should prevent any file from being written."""
+    base = _make_tree(tmp_path)
+    src, dst = base / 'src', base / 'dst'
+    for i in range(20):
+        (src / f'extra{i}.py').write_bytes(f'val = {i}\n'.encode())
+    sync_paths('src', src, dst, Mode.PULL)
+
+    # Give the workers plenty of other things they could be writing.
+    for i in range(20):
+        (src / f'extra{i}.py').write_bytes(f'val = {i + 100}\n'.encode())
+    (src / 'new.py').write_bytes(b'')
+    (src / 'pkg' / 'sub.py').write_bytes(b'bar = 3\n')
+    (dst / 'pkg' /
+     'sub.py').write_bytes((dst / 'pkg' / 'sub.py').read_bytes() +
+                           b'eep = 4\n')
+
+    before = _snapshot(base)
+    for mode in (Mode.PULL, Mode.FULL):
+        with pytest.raises(RuntimeError, match='both src and dst'):
+            sync_paths('src', src, dst, mode)
+        assert _snapshot(base) == before
+
+
+def _legacy_header(data: bytes) -> bytes:
+    """Return the md5 marker block data would have been synced with."""
+    hashval = int.from_bytes(hashlib.md5(data).digest(), byteorder='big')
+    return f'# Synced from src.\n# EFRO_SYNC_HASH={hashval}\n#\n'.encode()
+
+
+def _make_legacy_tree(tmp_path: Path) -> Path:
+    """Set up a src/dst pair synced before the blake2b switch."""
+    src, dst = tmp_path / 'src', tmp_path / 'dst'
+    src.mkdir()
+    dst.mkdir()
+    (src / 'mod.py').write_bytes(_SRC_DATA)
+    (dst / 'mod.py').write_bytes(_legacy_header(_SRC_DATA) + _SRC_DATA)
+    return tmp_path
+
+
+def test_legacy_marker_dst_edited(tmp_path: Path) -> None:
+    """A legacy-marked file edited only in dst should push, not conflict."""
+    base = _make_legacy_tree(tmp_path)
+    src, dst = base / 'src', base / 'dst'
+    edited = _SRC_DATA + b'bar = 2\n'
+    (dst / 'mod.py').write_bytes(_legacy_header(_SRC_DATA) + edited)
+
+    # Pull should refuse to clobber the dst change...
+    with pytest.raises(RuntimeError, match='run a FULL mode sync'):
+        sync_paths('src', src, dst, Mode.PULL)
+
+    # ...while full should push it back to src and leave a new marker.
+    sync_paths('src', src, dst, Mode.FULL)
+    assert (src / 'mod.py').read_bytes() == edited
+    assert b'EFRO_SYNC_HASH2=' in (dst / 'mod.py').read_bytes()
+    assert check_path(dst) == 1
+
+
+def test_legacy_marker_unchanged(tmp_path: Path) -> None:
+    """Untouched legacy-marked files should be left alone."""
+    base = _make_legacy_tree(tmp_path)
+    src, dst = base / 'src', base / 'dst'
+    before = _snapshot(base)
+    assert check_path(dst) == 1
+    sync_paths('src', src, dst, Mode.FULL)
+    assert _snapshot(base) == before
+
+
+def test_legacy_marker_src_edited(tmp_path: Path) -> None:
+    """A legacy-marked file edited only in src should pull normally."""
+    base = _make_legacy_tree(tmp_path)
+    src, dst = base / 'src', base / 'dst'
+    edited = _SRC_DATA + b'bar = 2\n'
+    (src / 'mod.py').write_bytes(edited)
+    sync_paths('src', src, dst, Mode.PULL)
+    dstdata = (dst / 'mod.py').read_bytes()
+    assert b'EFRO_SYNC_HASH2=' in dstdata
+    assert dstdata.endswith(edited)
+    assert check_path(dst) == 1
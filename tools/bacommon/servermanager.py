@@ -21,12 +21,13 @@
 """Functionality related to the server manager script."""
 from __future__ import annotations
 
+import json
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict, is_dataclass
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from typing import Optional
+    from typing import Optional, Dict, Any, Type
 
 
 @dataclass
@@ -113,14 +114,45 @@ class ServerConfig:
 # child-process should go through these and not ad-hoc Python string commands
 # since this way is type safe.
 class ServerCommand:
-    """Base class for commands that can be sent to the server."""
+    """Base class for commands that can be sent to the server.
+
+    Commands are serialized as a single type-id byte followed by a json
+    payload; see to_bytes() and decode_server_command().
+    """
+
+    # Unique per command type; used to tag serialized data.
+    # (note that legacy pickled commands always start with 0x80)
+    TYPE_ID = 0
+
+    def to_bytes(self) -> bytes:
+        """Serialize this command for sending to the server."""
+        return bytes((self.TYPE_ID, )) + json.dumps(self._to_dict()).encode()
+
+    # These defaults handle dataclass commands whose fields are plain
+    # json types; commands with anything fancier should override them.
+    def _to_dict(self) -> Dict[str, Any]:
+        if not is_dataclass(self):
+            raise TypeError(f'{type(self).__name__} is not a dataclass.')
+        return asdict(self)
+
+    @classmethod
+    def _from_dict(cls, data: Dict[str, Any]) -> ServerCommand:
+        return cls(**data)
 
 
 @dataclass
 class StartServerModeCommand(ServerCommand):
     """Tells the app to switch into 'server' mode."""
+    TYPE_ID = 1
     config: ServerConfig
 
+    @classmethod
+    def _from_dict(cls, data: Dict[str, Any]) -> ServerCommand:
+        from efro.dataclassutils import dataclass_assign
+        config = ServerConfig()
+        dataclass_assign(config, data['config'])
+        return cls(config=config)
+
 
 class ShutdownReason(Enum):
     """Reason a server is shutting down."""
@@ -131,5 +163,45 @@ class ShutdownReason(Enum):
 @dataclass
 class ShutdownCommand(ServerCommand):
     """Tells the server to shut down."""
+    TYPE_ID = 2
     reason: ShutdownReason
     immediate: bool
+
+    def _to_dict(self) -> Dict[str, Any]:
+        return {'reason': self.reason.value, 'immediate': self.immediate}
+
+    @classmethod
+    def _from_dict(cls, data: Dict[str, Any]) -> ServerCommand:
+        immediate = data['immediate']
+        if not isinstance(immediate, bool):
+            raise TypeError(f'Invalid immediate value: {immediate!r}')
+        return cls(reason=ShutdownReason(data['reason']), immediate=immediate)
+
+
+# The full set of commands we'll accept, keyed by TYPE_ID.
+_COMMAND_TYPES: Dict[int, Type[ServerCommand]] = {
+    cls.TYPE_ID: cls
+    for cls in (StartServerModeCommand, ShutdownCommand)
+}
+
+
+def decode_server_command(data: bytes) -> ServerCommand:
+    """Reconstruct a command from ServerCommand.to_bytes() output.
+
+    Only known command types are accepted; a ValueError is raised
+    for anything else (undecodable or incomplete data included). A
+    TypeError is raised for values of the wrong type.
+    """
+    cls = _COMMAND_TYPES.get(data[0]) if data else None
+    if cls is None:
+        raise ValueError('Unrecognized server command data.')
+
+    # Note: this raises ValueError subclasses for non-utf8 or bad json.
+    payload = json.loads(data[1:])
+    if not isinstance(payload, dict):
+        raise ValueError('Unrecognized server command data.')
+    try:
+        return cls._from_dict(payload)  # pylint: disable=protected-access
+    except KeyError as exc:
+        raise ValueError(
+            f'Missing field {exc} in {cls.__name__} data.') from exc
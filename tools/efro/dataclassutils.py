@@ -22,10 +22,11 @@
 from __future__ import annotations
 
 import dataclasses
+import functools
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from typing import Any, Dict, Type, Tuple
+    from typing import Any, Dict, Type, Tuple, FrozenSet
 
 # For fields with these string types, we require a passed value's type
 # to exactly match one of the tuple values to consider the assignment valid.
@@ -41,6 +42,48 @@ _SIMPLE_ASSIGN_TYPES: Dict[str, Tuple[Type, ...]] = {
 }
 
 
+def _expected_type_str(reqtypes: Tuple[Type, ...]) -> str:
+    if len(reqtypes) == 1:
+        return reqtypes[0].__name__
+    names = ', '.join(t.__name__ for t in reqtypes)
+    return f'Union[{names}]'
+
+
+# Precalculated sets of allowed types and their descriptions for the above.
+_SIMPLE_ASSIGN_META: Dict[str, Tuple[FrozenSet[Type], str]] = {
+    fieldtype: (frozenset(reqtypes), _expected_type_str(reqtypes))
+    for fieldtype, reqtypes in _SIMPLE_ASSIGN_TYPES.items()
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _field_types_for(cls: Type) -> Dict[str, Tuple[FrozenSet[Type], str]]:
+    """Return allowed value types (and their description) by field name.
+
+    Raises an exception if the dataclass has any unsupported field types.
+    """
+    if not dataclasses.is_dataclass(cls):
+        raise TypeError(f'Passed instance of {cls} is not a dataclass.')
+    out: Dict[str, Tuple[FrozenSet[Type], str]] = {}
+    for field in dataclasses.fields(cls):
+
+        # We expect to be operating under 'from __future__ import
+        # annotations' so field types should always be strings for us;
+        # not actual types. Complain if we come across an actual type.
+        fieldtype: str = field.type  # type: ignore
+        if not isinstance(fieldtype, str):
+            raise RuntimeError(
+                f'Dataclass {cls.__name__} seems to have'
+                f' been created without "from __future__ import annotations";'
+                f' those dataclasses are unsupported here.')
+
+        meta = _SIMPLE_ASSIGN_META.get(fieldtype)
+        if meta is None:
+            raise TypeError(f'Field type "{fieldtype}" is unsupported here.')
+        out[field.name] = meta
+    return out
+
+
 def dataclass_assign(instance: Any, values: Dict[str, Any]) -> None:
     """Safely assign values from a dict to a dataclass instance.
 
@@ -60,42 +103,23 @@ def dataclass_assign(instance: Any, values: Dict[str, Any]) -> None:
     the increased safety checks may be worth the speed tradeoff in some
     cases.
     """
-    if not dataclasses.is_dataclass(instance):
-        raise TypeError(f'Passed instance {instance} is not a dataclass.')
-    if not isinstance(values, dict):
+    # Note: this raises TypeError for non-dataclasses; valid types are
+    # just a cache lookup after their first use.
+    fieldtypes = _field_types_for(type(instance))
+
+    # pylint: disable=unidiomatic-typecheck
+    if type(values) is not dict and not isinstance(values, dict):
         raise TypeError("Expected a dict for 'values' arg.")
-    fields = dataclasses.fields(instance)
-    fieldsdict = {f.name: f for f in fields}
+    if values.keys() - fieldtypes.keys():
+        badkey = next(key for key in values if key not in fieldtypes)
+        raise AttributeError(f"'{type(instance).__name__}' dataclass has"
+                             f" no '{badkey}' field.")
     for key, value in values.items():
-        if key not in fieldsdict:
-            raise AttributeError(f"'{type(instance).__name__}' dataclass has"
-                                 f" no '{key}' field.")
-        field = fieldsdict[key]
-
-        # We expect to be operating under 'from __future__ import annotations'
-        # so field types should always be strings for us; not an actual types.
-        # Complain if we come across an actual type.
-        fieldtype: str = field.type  # type: ignore
-        if not isinstance(fieldtype, str):
-            raise RuntimeError(
-                f'Dataclass {type(instance).__name__} seems to have'
-                f' been created without "from __future__ import annotations";'
-                f' those dataclasses are unsupported here.')
 
-        reqtypes = _SIMPLE_ASSIGN_TYPES.get(fieldtype)
-        if reqtypes is not None:
-            # pylint: disable=unidiomatic-typecheck
-            if not any(type(value) is t for t in reqtypes):
-                if len(reqtypes) == 1:
-                    expected = reqtypes[0].__name__
-                else:
-                    names = ', '.join(t.__name__ for t in reqtypes)
-                    expected = f'Union[{names}]'
-                raise TypeError(f'Invalid value type for "{key}";'
-                                f' expected "{expected}", got'
-                                f' "{type(value).__name__}".')
-        else:
-            raise TypeError(f'Field type "{fieldtype}" is unsupported here.')
+        # Note: this compares exact types; not isinstance().
+        reqtypes, expected = fieldtypes[key]
+        if type(value) not in reqtypes:
+            raise _invalid_value_type_error(key, expected, value)
 
         # Ok, if we made it here, the value is kosher. Do the assign.
         setattr(instance, key, value)
@@ -107,9 +131,16 @@ def dataclass_validate(instance: Any) -> None:
     Note that this will always fail if a dataclass contains field types
     not supported by this module.
     """
-    # We currently simply operate by grabbing dataclass values as a dict
-    # and passing them through dataclass_assign().
-    # It would be possible to write slightly more efficient custom code,
-    # this, but this keeps things simple and will allow us to easily
-    # incorporate things like value coercion later if we add that.
-    dataclass_assign(instance, dataclasses.asdict(instance))
+    # Run the same checks as dataclass_assign() directly against our
+    # current values; no need to copy them out or assign them back.
+    for key, (reqtypes, expected) in _field_types_for(type(instance)).items():
+        value = getattr(instance, key)
+        if type(value) not in reqtypes:
+            raise _invalid_value_type_error(key, expected, value)
+
+
+def _invalid_value_type_error(key: str, expected: str,
+                              value: Any) -> TypeError:
+    return TypeError(f'Invalid value type for "{key}";'
+                     f' expected "{expected}", got'
+                     f' "{type(value).__name__}".')
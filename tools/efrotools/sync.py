@@ -25,6 +25,14 @@ This can be preferable vs using shared git subrepos for certain use cases.
 from __future__ import annotations
 
 import os
+import re
+import stat
+import json
+import time
+import shutil
+import hashlib
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
@@ -33,7 +41,23 @@ from typing import TYPE_CHECKING
 from efro.terminal import Clr
 
 if TYPE_CHECKING:
-    from typing import List, Tuple, Optional, Sequence
+    from typing import (List, Tuple, Optional, Sequence, Iterator, Any, Dict,
+                        Set, BinaryIO)
+
+# Files are read and hashed in chunks of this size.
+_READ_CHUNK_SIZE = 1024 * 1024
+
+# Marker tag for the hash line in synced files. Files synced before the
+# switch to blake2b carry a legacy md5-based 'EFRO_SYNC_HASH=' tag; we
+# still understand it and they get the new one the next time they are
+# written.
+_MARKER_TAG = b'EFRO_SYNC_HASH2='
+
+# Matches either tag; the first group is empty for legacy ones.
+_MARKER_RE = re.compile(rb'EFRO_SYNC_HASH(2?)=(\d+)')
+
+# Decimal digits in our (16 byte) hash strings.
+_HASH_DIGITS = len(str(2**128 - 1))
 
 
 class Mode(Enum):
@@ -45,6 +69,15 @@ class Mode(Enum):
     CHECK = 'check'  # Make no changes; errors if dst has changed since sync.
 
 
+# Non-python files we're ok with syncing.
+_SYNC_SPECIAL_NAMES = frozenset({
+    'requirements.txt', 'pylintrc', 'clang-format', 'pycheckers', 'style.yapf',
+    'test_task_bin', '.editorconfig'
+})
+_SYNC_EXTENSIONS = ('.py', '.pyi')
+
+
+@functools.lru_cache(maxsize=4096)
 def _valid_filename(fname: str) -> bool:
     """Is this a file we're ok with syncing?
 
@@ -52,13 +85,42 @@ def _valid_filename(fname: str) -> bool:
     """
     if os.path.basename(fname) != fname:
         raise ValueError(f'{fname} is not a simple filename.')
-    if fname in [
-            'requirements.txt', 'pylintrc', 'clang-format', 'pycheckers',
-            'style.yapf', 'test_task_bin', '.editorconfig'
-    ]:
+    if fname in _SYNC_SPECIAL_NAMES:
         return True
-    return (any(fname.endswith(ext) for ext in ('.py', '.pyi'))
-            and 'flycheck_' not in fname)
+    return fname.endswith(_SYNC_EXTENSIONS) and 'flycheck_' not in fname
+
+
+def _iter_files(root: str) -> Iterator[os.DirEntry[str]]:
+    """Recursively yield entries for all files under a dir.
+
+    Uses os.scandir so file/dir info comes from the cached dir-entry
+    data instead of a stat call per entry. Like os.walk, symlinked dirs
+    are not descended into.
+    """
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_files(entry.path)
+            elif entry.is_file():
+                yield entry
+
+
+def _iter_entries(root: str,
+                  skip_hidden: bool = False) -> Iterator[os.DirEntry[str]]:
+    """Recursively yield entries for all files and dirs under a dir.
+
+    Dirs are yielded before their contents. If skip_hidden is True,
+    '.'-prefixed and __pycache__ entries are skipped entirely (including
+    anything under them).
+    """
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if skip_hidden and (entry.name.startswith('.')
+                                or '__pycache__' in entry.name):
+                continue
+            yield entry
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_entries(entry.path, skip_hidden)
 
 
 @dataclass
@@ -69,6 +131,73 @@ class SyncItem:
     dst_path: Optional[str] = None
 
 
+class HashCache:
+    """Caches hashes for synced files keyed by their size and mtime.
+
+    This lets us skip reading and hashing files that have not changed
+    since the last run, which is nearly all of them.
+    """
+
+    # Bump this if what we store or how we hash changes.
+    VERSION = 2
+
+    # Mtimes can be as coarse as a second or so, so a file modified this
+    # soon before we write the cache could be changed again without its
+    # size or mtime changing. We don't save entries for those (though
+    # they'll get cached on a later run).
+    RACY_WINDOW_NS = 2 * 10**9
+
+    def __init__(self, path: Optional[Path] = None):
+        self._path = path
+        self._prev_entries: Dict[str, List[Any]] = {}
+
+        # Entries used during this run; only these get written back out
+        # so entries for files we no longer sync get pruned naturally.
+        # (note: this is accessed from worker threads but individual
+        # dict gets/sets are atomic so we're ok)
+        self._entries: Dict[str, List[Any]] = {}
+        if path is not None and path.exists():
+            with path.open() as infile:
+                data = json.loads(infile.read())
+            if data.get('version') == self.VERSION:
+                self._prev_entries = data['entries']
+
+    def get(self, path: Path, statinfo: os.stat_result) -> Optional[List[str]]:
+        """Return cached hash values for a file if it's unchanged."""
+        key = os.path.abspath(path)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._prev_entries.get(key)
+        if (entry is None or entry[0] != statinfo.st_size
+                or entry[1] != statinfo.st_mtime_ns):
+            return None
+        self._entries[key] = entry
+        return entry[2:]
+
+    def put(self, path: Path, statinfo: os.stat_result,
+            values: List[str]) -> None:
+        """Store hash values for a file."""
+        key = os.path.abspath(path)
+        self._entries[key] = [statinfo.st_size, statinfo.st_mtime_ns] + values
+
+    def write(self) -> None:
+        """Write the cache back to its file."""
+        if self._path is None:
+            return
+        cutoff = time.time_ns() - self.RACY_WINDOW_NS
+        entries = {
+            key: entry
+            for key, entry in self._entries.items() if entry[1] < cutoff
+        }
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with self._path.open('w') as outfile:
+            outfile.write(
+                json.dumps({
+                    'version': self.VERSION,
+                    'entries': entries
+                }))
+
+
 def run_standard_syncs(projectroot: Path, mode: Mode,
                        syncitems: Sequence[SyncItem]) -> None:
     """Run a standard set of syncs.
@@ -78,6 +207,7 @@ def run_standard_syncs(projectroot: Path, mode: Mode,
     """
     from efrotools import get_localconfig
     localconfig = get_localconfig(projectroot)
+    hashcache = HashCache(Path(projectroot, 'config/.cache-sync'))
     for syncitem in syncitems:
         assert isinstance(syncitem, SyncItem)
         src_project = syncitem.src_project_id
@@ -87,7 +217,7 @@ def run_standard_syncs(projectroot: Path, mode: Mode,
         dstname = os.path.basename(dst_subpath)
         if mode == Mode.CHECK:
             print(f'Checking sync target {dstname}...')
-            count = check_path(Path(dst_subpath))
+            count = check_path(Path(dst_subpath), hashcache)
             print(f'Sync check passed for {count} items.')
         else:
             link_entry = f'linked_{src_project}'
@@ -98,14 +228,20 @@ def run_standard_syncs(projectroot: Path, mode: Mode,
                 continue
             src = Path(localconfig[link_entry], src_subpath)
             print(f'Processing {dstname} in {mode.name} mode...')
-            count = sync_paths(src_project, src, Path(dst_subpath), mode)
+            count = sync_paths(src_project, src, Path(dst_subpath), mode,
+                               hashcache)
             if mode in [Mode.LIST, Mode.CHECK]:
                 print(f'Scanned {count} items.')
             else:
                 print(f'Sync successful for {count} items.')
+    hashcache.write()
 
 
-def sync_paths(src_proj: str, src: Path, dst: Path, mode: Mode) -> int:
+def sync_paths(src_proj: str,
+               src: Path,
+               dst: Path,
+               mode: Mode,
+               hashcache: Optional[HashCache] = None) -> int:
     """Sync src and dst paths."""
     # pylint: disable=too-many-branches
     # pylint: disable=too-many-locals
@@ -114,119 +250,92 @@ def sync_paths(src_proj: str, src: Path, dst: Path, mode: Mode) -> int:
         raise ValueError('sync_paths cannot be called in CHECK mode')
     if not (src.is_dir() or src.is_file()):
         raise ValueError(f'src path is not a dir or file: {src}')
+    if hashcache is None:
+        hashcache = HashCache()
 
     changed_error_dst_files: List[Path] = []
 
     # Build a list of all valid source files and their equivalent paths in dst.
-    allpaths: List[Tuple[Path, Path]] = []
+    # (we hang on to src dir-entries when we have them since they may
+    # have already cached stat info for us)
+    allpaths: List[Tuple[Path, Path, Optional[os.DirEntry[str]]]] = []
+
+    # Also note everything that exists under src (not just syncable files)
+    # so we can spot orphans in dst without checking src for each one.
+    src_relpaths: Set[str] = set()
 
     if src.is_file():
         if not _valid_filename(src.name):
             raise ValueError(f'provided sync-path {src} is not syncable')
-        allpaths.append((src, dst))
+        allpaths.append((src, dst, None))
     else:
-        for root, _dirs, fnames in os.walk(src):
-            for fname in fnames:
-                if _valid_filename(fname):
-                    srcpathfull = Path(root, fname)
-                    relpath = srcpathfull.relative_to(src)
-                    dstpathfull = Path(dst, relpath)
-                    allpaths.append((srcpathfull, dstpathfull))
-    for srcfile, dstfile in allpaths:
-        if not srcfile.is_file():
-            raise RuntimeError(f'Invalid src file: {srcfile}.')
-        dstfile.parent.mkdir(parents=True, exist_ok=True)
-        with srcfile.open() as infile:
-            srcdata = infile.read()
-        src_hash = string_hash(srcdata)
-
-        if not dstfile.is_file() or mode == Mode.FORCE:
-            if mode == Mode.LIST:
-                print(f'Would pull from {src_proj}:'
-                      f' {Clr.SGRN}{dstfile}{Clr.RST}')
-            else:
-                print(f'Pulling from {src_proj}: {Clr.SGRN}{dstfile}{Clr.RST}')
-
-                # No dst file; pull src across.
-                with dstfile.open('w') as outfile:
-                    outfile.write(add_marker(src_proj, srcdata))
-            continue
-
-        marker_hash, dst_hash, dstdata = get_dst_file_info(dstfile)
-
-        # Ok, we've now got hashes for src and dst as well as a 'last-known'
-        # hash. If only one of the two files differs from it we can
-        # do a directional sync. If they both differ then we're out of luck.
-        if src_hash != marker_hash and dst_hash == marker_hash:
-            if mode == Mode.LIST:
-                print(f'Would pull from {src_proj}:'
-                      f' {Clr.SGRN}{dstfile}{Clr.RST}')
-            else:
-                print(f'Pulling from {src_proj}: {Clr.SGRN}{dstfile}{Clr.RST}')
-
-                # Src has changed; simply pull across to dst.
-                with dstfile.open('w') as outfile:
-                    outfile.write(add_marker(src_proj, srcdata))
-            continue
-        if src_hash == marker_hash and dst_hash != marker_hash:
-
-            # Dst has changed; we only copy backwards to src
-            # if we're in full mode.
-            if mode == Mode.LIST:
-                print(f'Would push to {src_proj}:'
-                      f' {Clr.SBLU}{dstfile}{Clr.RST}')
-            elif mode == Mode.FULL:
-                print(f'Pushing to {src_proj}: {Clr.SBLU}{dstfile}{Clr.RST}')
-                with srcfile.open('w') as outfile:
-                    outfile.write(dstdata)
-
-                # We ALSO need to rewrite dst to update its embedded hash
-                with dstfile.open('w') as outfile:
-                    outfile.write(add_marker(src_proj, dstdata))
-            else:
-                # Just make note here; we'll error after forward-syncs run.
-                changed_error_dst_files.append(dstfile)
-            continue
-
-        if marker_hash not in (src_hash, dst_hash):
-
-            # One more option: source and dst could have been changed in
-            # identical ways (common when doing global search/replaces).
-            # In this case the calced hash from src and dst will match
-            # but the stored hash in dst won't.
-            if src_hash == dst_hash:
-                if mode == Mode.LIST:
-                    print(f'Would update dst hash (both files changed'
-                          f' identically) from {src_proj}:'
-                          f' {Clr.SGRN}{dstfile}{Clr.RST}')
-                else:
-                    print(f'Updating hash (both files changed)'
-                          f' from {src_proj}: {Clr.SGRN}{dstfile}{Clr.RST}')
-                    with dstfile.open('w') as outfile:
-                        outfile.write(add_marker(src_proj, srcdata))
-                continue
-            # Src/dst hashes don't match and marker doesn't match either.
-            # We give up.
-            raise RuntimeError(
-                f'both src and dst sync files changed: {srcfile} {dstfile}'
-                '; this must be resolved manually.')
-
-        # (if we got here this file should be healthy..)
-        assert src_hash == marker_hash and dst_hash == marker_hash
+        # Stick with plain strings while walking; Path construction adds
+        # up on big trees so we only do it for files we'll actually sync.
+        srcprefixlen = len(os.path.join(src, ''))
+        dstprefix = os.path.join(dst, '')
+        for entry in _iter_entries(str(src)):
+            relpath = entry.path[srcprefixlen:]
+            src_relpaths.add(relpath)
+            if entry.is_file() and _valid_filename(entry.name):
+                allpaths.append(
+                    (Path(entry.path), Path(dstprefix + relpath), entry))
+
+    # Files are independent of each other and the work is mostly file io
+    # and hashing (both of which release the GIL), so spread it across
+    # threads. We first figure out everything that needs to happen without
+    # touching anything so that if any file can't be synced (conflicts,
+    # etc.) we bail before having changed anything.
+    # (note that if that raises, leaving the with block still waits for
+    # the other planning jobs to finish)
+    max_workers = min(32, (os.cpu_count() or 4) * 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        plans = list(
+            executor.map(
+                lambda item: _plan_file(item[0], item[1], item[2], mode,
+                                        hashcache), allpaths))
+
+    # Make sure all dst dirs exist. Lots of files share dirs so just hit
+    # each one once instead of once per file.
+    if mode != Mode.LIST:
+        dstdirs: Set[str] = set()
+        for plan in plans:
+            dstdir = os.path.dirname(plan.dstfile)
+            if (plan.action is _Action.PULL and dstdir
+                    and dstdir not in dstdirs):
+                os.makedirs(dstdir, exist_ok=True)
+                dstdirs.add(dstdir)
+
+    # Now actually do it. Output is printed in order from here so it
+    # doesn't jumble, and we let everything finish and report before
+    # raising any errors here.
+    errors: List[Exception] = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(
+            lambda plan: _apply_plan_safe(src_proj, plan, mode, hashcache),
+            plans)
+        for plan, (messages, dst_changed, error) in zip(plans, results):
+            for message in messages:
+                print(message)
+            if dst_changed:
+                changed_error_dst_files.append(plan.dstfile)
+            if error is not None:
+                errors.append(error)
+    if errors:
+        raise errors[0]
 
     # Now, if dst is a dir, iterate through and kill anything not in src.
     if dst.is_dir():
         killpaths: List[Path] = []
-        for root, dirnames, fnames in os.walk(dst):
-            for name in dirnames + fnames:
-                if (name.startswith('.') or '__pycache__' in root
-                        or '__pycache__' in name):
-                    continue
-                dstpathfull = Path(root, name)
-                relpath = dstpathfull.relative_to(dst)
-                srcpathfull = Path(src, relpath)
-                if not os.path.exists(srcpathfull):
-                    killpaths.append(dstpathfull)
+        dstprefixlen = len(os.path.join(dst, ''))
+        for entry in _iter_entries(str(dst), skip_hidden=True):
+            relpath = entry.path[dstprefixlen:]
+
+            # Names can differ in case only on case-insensitive
+            # filesystems (a src rename gets pulled over the existing dst
+            # file), so double check with the filesystem on a miss.
+            if (relpath not in src_relpaths
+                    and not os.path.exists(os.path.join(src, relpath))):
+                killpaths.append(Path(entry.path))
 
         # This is sloppy in that we'll probably recursively kill dirs and then
         # files under them, so make sure we look before we leap.
@@ -238,7 +347,10 @@ def sync_paths(src_proj: str, src: Path, dst: Path, mode: Mode) -> int:
                 else:
                     print(f'Removing orphaned sync path:'
                           f' {Clr.SRED}{killpath}{Clr.RST}')
-                    os.system('rm -rf "' + str(killpath) + '"')
+                    if killpath.is_dir() and not killpath.is_symlink():
+                        shutil.rmtree(killpath)
+                    else:
+                        killpath.unlink()
 
     # Lastly throw an error if we found any changed dst files and aren't
     # allowed to reverse-sync them back.
@@ -250,63 +362,393 @@ def sync_paths(src_proj: str, src: Path, dst: Path, mode: Mode) -> int:
     return len(allpaths)
 
 
-def check_path(dst: Path) -> int:
+class _Action(Enum):
+    """What needs to happen to sync a single file."""
+    NONE = 'none'  # All in sync.
+    PULL = 'pull'  # Src changed (or dst is missing); copy it to dst.
+    PUSH = 'push'  # Dst changed; copy it back to src (if allowed).
+    UPDATE_HASH = 'update_hash'  # Both changed identically; fix the marker.
+
+
+@dataclass
+class _FilePlan:
+    """The plan for syncing a single src/dst file pair."""
+    srcfile: Path
+    dstfile: Path
+    action: _Action
+    src_hash: str
+    dst_hash: Optional[str] = None
+    srcdata: Optional[bytes] = None
+    dstdata: Optional[bytes] = None
+
+
+def _plan_file(srcfile: Path, dstfile: Path,
+               srcentry: Optional[os.DirEntry[str]], mode: Mode,
+               hashcache: HashCache) -> _FilePlan:
+    """Figure out what needs to happen for a single src/dst file pair.
+
+    This never modifies anything on disk; it raises an Exception if the
+    pair can't be synced.
+    """
+    # pylint: disable=too-many-branches
+    srcstat = os.stat(srcfile) if srcentry is None else srcentry.stat()
+    if not stat.S_ISREG(srcstat.st_mode):
+        raise RuntimeError(f'Invalid src file: {srcfile}.')
+    src_hash, srcdata = _get_src_file_info(srcfile, srcstat, hashcache)
+
+    try:
+        dststat: Optional[os.stat_result] = os.stat(dstfile)
+    except (FileNotFoundError, NotADirectoryError):
+        dststat = None
+
+    if (dststat is None or not stat.S_ISREG(dststat.st_mode)
+            or mode == Mode.FORCE):
+        # No dst file; pull src across.
+        if srcdata is None and mode != Mode.LIST:
+            srcdata = _read_file(srcfile)
+        return _FilePlan(srcfile,
+                         dstfile,
+                         _Action.PULL,
+                         src_hash,
+                         srcdata=srcdata)
+
+    srcinfo = None if srcdata is None else (src_hash, srcdata)
+    marker_hash, dst_hash, dstdata = _get_cached_dst_file_info(
+        dstfile, dststat, hashcache, srcinfo)
+
+    # A legacy marker can only be matched against src if we have its
+    # contents; if we skipped reading them, do so now and look again.
+    if marker_hash not in (src_hash, dst_hash) and srcinfo is None:
+        srcdata = _read_file(srcfile)
+        marker_hash, dst_hash, dstdata = get_dst_file_info(
+            dstfile, (src_hash, srcdata))
+        hashcache.put(dstfile, dststat, [marker_hash, dst_hash])
+
+    # We only read file contents when the cache misses, so grab them
+    # now if we'll need them.
+    if mode != Mode.LIST:
+        if srcdata is None and src_hash != marker_hash:
+            srcdata = _read_file(srcfile)
+        if dstdata is None and dst_hash != marker_hash:
+            dstdata = get_dst_file_info(dstfile)[2]
+
+    # Ok, we've now got hashes for src and dst as well as a 'last-known'
+    # hash. If only one of the two files differs from it we can
+    # do a directional sync. If they both differ then we're out of luck.
+    if src_hash != marker_hash and dst_hash == marker_hash:
+        action = _Action.PULL
+    elif src_hash == marker_hash and dst_hash != marker_hash:
+        action = _Action.PUSH
+    elif marker_hash not in (src_hash, dst_hash):
+
+        # One more option: source and dst could have been changed in
+        # identical ways (common when doing global search/replaces).
+        # In this case the calced hash from src and dst will match
+        # but the stored hash in dst won't.
+        if src_hash != dst_hash:
+            # Src/dst hashes don't match and marker doesn't match either.
+            # We give up.
+            raise RuntimeError(
+                f'both src and dst sync files changed: {srcfile} {dstfile}'
+                '; this must be resolved manually.')
+        action = _Action.UPDATE_HASH
+    else:
+        # (if we got here this file should be healthy..)
+        assert src_hash == marker_hash and dst_hash == marker_hash
+        action = _Action.NONE
+    return _FilePlan(srcfile, dstfile, action, src_hash, dst_hash, srcdata,
+                     dstdata)
+
+
+def _apply_plan_safe(
+        src_proj: str, plan: _FilePlan, mode: Mode,
+        hashcache: HashCache) -> Tuple[List[str], bool, Optional[Exception]]:
+    """Run _apply_plan, returning any error instead of raising it."""
+    try:
+        messages, dst_changed = _apply_plan(src_proj, plan, mode, hashcache)
+        return messages, dst_changed, None
+    except Exception as exc:
+        return [], False, exc
+
+
+def _apply_plan(src_proj: str, plan: _FilePlan, mode: Mode,
+                hashcache: HashCache) -> Tuple[List[str], bool]:
+    """Carry out the plan for a single src/dst file pair.
+
+    Returns messages to be printed and whether dst has changed in a way
+    that can't be pushed back to src in this mode.
+    """
+    dstfile = plan.dstfile
+    messages: List[str] = []
+    if plan.action is _Action.PULL:
+        if mode == Mode.LIST:
+            messages.append(f'Would pull from {src_proj}:'
+                            f' {Clr.SGRN}{dstfile}{Clr.RST}')
+        else:
+            messages.append(
+                f'Pulling from {src_proj}: {Clr.SGRN}{dstfile}{Clr.RST}')
+            assert plan.srcdata is not None
+            _write_dst(src_proj, dstfile, plan.srcdata, plan.src_hash,
+                       hashcache)
+    elif plan.action is _Action.PUSH:
+
+        # Dst has changed; we only copy backwards to src
+        # if we're in full mode.
+        if mode == Mode.LIST:
+            messages.append(f'Would push to {src_proj}:'
+                            f' {Clr.SBLU}{dstfile}{Clr.RST}')
+        elif mode == Mode.FULL:
+            messages.append(
+                f'Pushing to {src_proj}: {Clr.SBLU}{dstfile}{Clr.RST}')
+            assert plan.dstdata is not None and plan.dst_hash is not None
+            with plan.srcfile.open('wb') as outfile:
+                outfile.write(plan.dstdata)
+            hashcache.put(plan.srcfile, os.stat(plan.srcfile), [plan.dst_hash])
+
+            # We ALSO need to update dst's embedded hash.
+            _update_marker(src_proj, dstfile, plan.dstdata, plan.dst_hash,
+                           hashcache)
+        else:
+            # Just make note here; we'll error after forward-syncs run.
+            return messages, True
+    elif plan.action is _Action.UPDATE_HASH:
+        if mode == Mode.LIST:
+            messages.append(f'Would update dst hash (both files changed'
+                            f' identically) from {src_proj}:'
+                            f' {Clr.SGRN}{dstfile}{Clr.RST}')
+        else:
+            messages.append(f'Updating hash (both files changed)'
+                            f' from {src_proj}: {Clr.SGRN}{dstfile}{Clr.RST}')
+            assert plan.srcdata is not None
+            _write_dst(src_proj, dstfile, plan.srcdata, plan.src_hash,
+                       hashcache)
+    return messages, False
+
+
+def check_path(dst: Path, hashcache: Optional[HashCache] = None) -> int:
     """Verify files under dst have not changed from their last sync."""
-    allpaths: List[Path] = []
-    for root, _dirs, fnames in os.walk(dst):
-        for fname in fnames:
-            if _valid_filename(fname):
-                allpaths.append(Path(root, fname))
-    for dstfile in allpaths:
-        marker_hash, dst_hash, _dstdata = get_dst_file_info(dstfile)
+    if hashcache is None:
+        hashcache = HashCache()
+    files: List[Tuple[Path, os.stat_result]] = []
+    if dst.is_dir():
+        for entry in _iter_files(str(dst)):
+            if _valid_filename(entry.name):
+                files.append((Path(entry.path), entry.stat()))
+    elif dst.is_file():
+        # Single-file sync items.
+        if _valid_filename(dst.name):
+            files.append((dst, dst.stat()))
+    for dstfile, dststat in files:
+        marker_hash, dst_hash, _dstdata = _get_cached_dst_file_info(
+            dstfile, dststat, hashcache)
 
         # All we can really check here is that the current hash hasn't
         # changed since the last sync.
         if marker_hash != dst_hash:
             raise RuntimeError(
                 f'sync dst file changed since last sync: {dstfile}')
-    return len(allpaths)
+    return len(files)
+
 
+def add_marker(src_proj: str,
+               srcdata: bytes,
+               hashstr: Optional[str] = None) -> bytes:
+    """Given the contents of a file, adds a 'synced from' notice and hash.
 
-def add_marker(src_proj: str, srcdata: str) -> str:
-    """Given the contents of a file, adds a 'synced from' notice and hash."""
+    If the hash of srcdata is already known it can be passed as hashstr
+    to avoid calculating it again.
+    """
+    _verify_not_synced(srcdata)
+    if hashstr is None:
+        hashstr = _hash_bytes(srcdata)
+
+    # Note that the data goes in exactly as-is so that the hash of
+    # everything after the marker always matches the one in it.
+    return _marker_header(src_proj, hashstr) + srcdata
 
-    lines = srcdata.splitlines()
 
+def _verify_not_synced(srcdata: bytes) -> None:
     # Make sure we're not operating on an already-synced file; that's just
     # asking for trouble.
-    if len(lines) > 1 and 'EFRO_SYNC_HASH=' in lines[1]:
+    lines = srcdata.split(b'\n', 2)
+    if len(lines) > 1 and b'EFRO_SYNC_HASH' in lines[1]:
         raise RuntimeError('Attempting to sync a file that is itself synced.')
 
-    hashstr = string_hash(srcdata)
-    lines.insert(0,
-                 f'# Synced from {src_proj}.\n# EFRO_SYNC_HASH={hashstr}\n#')
-    return '\n'.join(lines) + '\n'
+
+def _marker_header(src_proj: str, hashstr: str) -> bytes:
+    return (f'# Synced from {src_proj}.\n'
+            f'# {_MARKER_TAG.decode()}{hashstr}\n#\n').encode()
+
+
+def _update_marker(src_proj: str, dstfile: Path, dstdata: bytes, hashstr: str,
+                   hashcache: HashCache) -> None:
+    """Update the marker of a synced file whose contents have changed.
+
+    Hashes are fixed width so the header is usually the same size as
+    before, in which case we only need to overwrite it instead of
+    rewriting the whole file.
+    """
+    header = _marker_header(src_proj, hashstr)
+    with dstfile.open('r+b') as outfile:
+        oldlen = sum(len(outfile.readline()) for _ in range(3))
+        if oldlen == len(header):
+            outfile.seek(0)
+            outfile.write(header)
+            inplace = True
+        else:
+            inplace = False
+    if inplace:
+        hashcache.put(dstfile, os.stat(dstfile), [hashstr, hashstr])
+    else:
+        _write_dst(src_proj, dstfile, dstdata, hashstr, hashcache)
+
+
+def _write_dst(src_proj: str, dstfile: Path, data: bytes, datahash: str,
+               hashcache: HashCache) -> None:
+    """Write a synced dst file.
+
+    The hashes for what we wrote get stored in the cache so that later
+    syncs or checks in this run or the next don't have to read it back.
+    """
+    # Same as writing add_marker() results but without building a copy
+    # of the whole file just to stick a header on it.
+    _verify_not_synced(data)
+    with dstfile.open('wb') as outfile:
+        outfile.write(_marker_header(src_proj, datahash))
+        outfile.write(data)
+    hashcache.put(dstfile, os.stat(dstfile), [datahash, datahash])
 
 
 def string_hash(data: str) -> str:
     """Given a string, return a hash."""
-    import hashlib
-    md5 = hashlib.md5()
-    md5.update(data.encode())
+    return _hash_bytes(data.encode())
+
+
+def _hash_bytes(data: bytes) -> str:
+    """Given some bytes, return a hash."""
+    hasher = _new_hasher()
+    hasher.update(data)
+    return _digest_str(hasher.digest())
 
+
+def _new_hasher() -> Any:
+    # This is only used for change detection so we don't need anything
+    # cryptographically strong; blake2b is much faster than md5 and is
+    # always available in hashlib. (Note that all projects syncing with
+    # each other need to agree on this, so it can't just be whatever
+    # happens to be installed.)
+    return hashlib.blake2b(digest_size=16)
+
+
+def _digest_str(digest: bytes) -> str:
     # Note: returning plain integers instead of hex so linters
-    # don't see words and give spelling errors.
-    return str(int.from_bytes(md5.digest(), byteorder='big'))
+    # don't see words and give spelling errors. These are zero-padded
+    # so they are always the same length.
+    return str(int.from_bytes(digest, byteorder='big')).zfill(_HASH_DIGITS)
+
+
+def _legacy_hash_str(data: bytes) -> str:
+    """Return the old md5-based marker value for some data."""
+    return str(int.from_bytes(hashlib.md5(data).digest(), byteorder='big'))
+
 
+def _read_and_hash(path: Path) -> Tuple[str, bytes]:
+    """Read a file's contents in binary mode, hashing as we go.
 
-def get_dst_file_info(dstfile: Path) -> Tuple[str, str, str]:
-    """Given a path, returns embedded marker hash and its actual hash."""
-    with dstfile.open() as infile:
+    Returns the hash and the contents.
+    """
+    # We're reading in big chunks so skip the buffered reader layer.
+    with open(path, 'rb', buffering=0) as infile:
+        return _read_and_hash_rest(infile)
+
+
+def _read_file(path: Path) -> bytes:
+    """Read a file's entire contents.
+
+    Uses an unbuffered file so readall() can size its buffer from the file
+    up front and read it in one go.
+    """
+    with open(path, 'rb', buffering=0) as infile:
+        return infile.readall()
+
+
+def _read_and_hash_rest(infile: BinaryIO) -> Tuple[str, bytes]:
+    """Read and hash the remainder of an open binary file."""
+    hasher = _new_hasher()
+    chunks: List[bytes] = []
+    while True:
+        chunk = infile.read(_READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        hasher.update(chunk)
+        chunks.append(chunk)
+    return _digest_str(hasher.digest()), b''.join(chunks)
+
+
+def _get_src_file_info(srcfile: Path, srcstat: os.stat_result,
+                       hashcache: HashCache) -> Tuple[str, Optional[bytes]]:
+    """Return a src file's hash and, if they had to be read, its contents."""
+    cached = hashcache.get(srcfile, srcstat)
+    if cached is not None:
+        return cached[0], None
+    src_hash, srcdata = _read_and_hash(srcfile)
+    hashcache.put(srcfile, srcstat, [src_hash])
+    return src_hash, srcdata
+
+
+def _get_cached_dst_file_info(
+    dstfile: Path,
+    dststat: os.stat_result,
+    hashcache: HashCache,
+    srcinfo: Optional[Tuple[str, bytes]] = None
+) -> Tuple[str, str, Optional[bytes]]:
+    """Like get_dst_file_info but skips reading if the cache allows."""
+    cached = hashcache.get(dstfile, dststat)
+    if cached is not None:
+        return cached[0], cached[1], None
+    marker_hash, dst_hash, dstdata = get_dst_file_info(dstfile, srcinfo)
+    hashcache.put(dstfile, dststat, [marker_hash, dst_hash])
+    return marker_hash, dst_hash, dstdata
+
+
+def get_dst_file_info(
+        dstfile: Path,
+        srcinfo: Optional[Tuple[str, bytes]] = None) -> Tuple[str, str, bytes]:
+    """Given a path, returns embedded marker hash and its actual hash.
+
+    If the hash and contents of the src file are passed as srcinfo and
+    the dst contents turn out to be identical, the src hash is reused
+    instead of hashing dst.
+    """
+    with dstfile.open('rb') as infile:
+
+        # Pull the marker block off the top line by line; everything
+        # after it is the actual data.
+        if not infile.readline():
+            raise ValueError(f'no lines found in {dstfile}')
+        match = _MARKER_RE.search(infile.readline())
+        if match is None:
+            raise ValueError(f'no EFRO_SYNC_HASH found in {dstfile}')
+        infile.readline()
+
+        # Return data minus the hash line.
         dstdata = infile.read()
-    dstlines = dstdata.splitlines()
-    if not dstlines:
-        raise ValueError(f'no lines found in {dstfile}')
-    if 'EFRO_SYNC_HASH' not in dstlines[1]:
-        raise ValueError(f'no EFRO_SYNC_HASH found in {dstfile}')
-    marker_hash = dstlines[1].split('EFRO_SYNC_HASH=')[1]
-
-    # Return data minus the hash line.
-    dstdata = '\n'.join(dstlines[3:]) + '\n'
-    dst_hash = string_hash(dstdata)
+
+    # Comparing bytes is a good bit cheaper than hashing them, and
+    # identical src and dst is the common case.
+    if srcinfo is not None and dstdata == srcinfo[1]:
+        dst_hash = srcinfo[0]
+    else:
+        dst_hash = _hash_bytes(dstdata)
+
+    marker_hash = match.group(2).decode()
+    if not match.group(1):
+        # Legacy md5 marker. If either dst or src (when provided) is
+        # unchanged since the sync we can map the marker onto its
+        # current hash. Otherwise it will never match anything.
+        if marker_hash == _legacy_hash_str(dstdata):
+            marker_hash = dst_hash
+        elif (srcinfo is not None
+              and marker_hash == _legacy_hash_str(srcinfo[1])):
+            marker_hash = srcinfo[0]
     return marker_hash, dst_hash, dstdata